@@ -0,0 +1,68 @@
+# compare the optimized GCNN feed-forward heads against the float32 eager
+# model on a sample of molecules; usage:
+#     python check_parity.py <input_csv> [<checkpoint>]
+# the input CSV holds SMILES in its first column, with a header; exits with
+# status 1 if the TorchScript head differs by more than 1e-5 or the int8
+# head changes a 3-decimal probability by more than 1e-3; predictions do not
+# use an int8 head until this check passes on the bundled checkpoint
+import copy
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import torch
+import torch.nn as nn
+
+root = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(root, ".."))
+sys.path.append(os.path.join(root, "..", "predictors"))
+
+from predictors.utilities.utilities import load_gcnn_model
+from chemprop.chemprop.data import MoleculeDataLoader, MoleculeDataset
+from chemprop.chemprop.data.utils import get_data_from_smiles
+from chemprop.chemprop.train import predict
+
+SCRIPT_TOLERANCE = 1e-5
+INT8_TOLERANCE = 1e-3
+
+
+def _predict(model, scaler, data):
+    data_loader = MoleculeDataLoader(dataset=data, batch_size=256, num_workers=0)
+    with torch.inference_mode():
+        preds = predict(model=model, data_loader=data_loader, disable_progress_bar=True, scaler=scaler)
+    return np.array(preds)[:, 0]
+
+
+if __name__ == "__main__":
+    input_file = sys.argv[1]
+    model_file_path = sys.argv[2] if len(sys.argv) > 2 else os.path.abspath(
+        os.path.join(root, "..", "..", "checkpoints", "gcnn_model.pt")
+        )
+
+    smiles = pd.read_csv(input_file, usecols=[0], dtype=str).iloc[:, 0].tolist()
+    data = get_data_from_smiles(smiles=smiles, skip_invalid_smiles=True)
+    data = MoleculeDataset([d for d in data if d.mol.GetNumAtoms() > 0])
+
+    scaler, model = load_gcnn_model(model_file_path, model_file_path)
+    model = model.cpu().eval()
+    fp32 = _predict(model, scaler, data)
+
+    scripted_model = copy.deepcopy(model)
+    scripted_model.ffn = torch.jit.script(scripted_model.ffn)
+    scripted = _predict(scripted_model, scaler, data)
+
+    int8_model = copy.deepcopy(model)
+    int8_model.ffn = torch.quantization.quantize_dynamic(int8_model.ffn, {nn.Linear}, dtype=torch.qint8)
+    int8 = _predict(int8_model, scaler, data)
+
+    script_diff = np.abs(scripted - fp32).max()
+    int8_diff = np.abs(np.around(int8, 3) - np.around(fp32, 3)).max()
+    int8_changed = np.mean(np.around(int8, 3) != np.around(fp32, 3))
+    print(f"{len(data)} molecules")
+    print(f"TorchScript head: max |diff| = {script_diff:.2e} (tolerance {SCRIPT_TOLERANCE:.0e})")
+    print(f"int8 head: max |diff| of 3-decimal probabilities = {int8_diff:.3f} "
+          f"(tolerance {INT8_TOLERANCE:.0e}), {int8_changed:.1%} of values changed")
+
+    if script_diff > SCRIPT_TOLERANCE or int8_diff > INT8_TOLERANCE + 1e-9:
+        sys.exit(1)
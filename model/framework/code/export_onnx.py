@@ -0,0 +1,19 @@
+# export the PAMPA GCNN feed-forward head to ONNX so that predictions run
+# it with ONNX Runtime; usage: python export_onnx.py
+import os
+import sys
+
+root = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(root, ".."))
+sys.path.append(os.path.join(root, "..", "predictors"))
+
+from predictors.utilities.utilities import load_gcnn_model, export_gcnn_ffn_onnx
+
+checkpoints_dir = os.path.abspath(os.path.join(root, "..", "..", "checkpoints"))
+model_file_path = os.path.join(checkpoints_dir, "gcnn_model.pt")
+
+if __name__ == "__main__":
+    onnx_file_path = os.path.join(checkpoints_dir, "gcnn_ffn.onnx")
+    _, gcnn_model = load_gcnn_model(model_file_path, model_file_path)
+    export_gcnn_ffn_onnx(gcnn_model, onnx_file_path, model_file_path)
+    print(f"Exported GCNN feed-forward head to {onnx_file_path}")
@@ -1,41 +1,178 @@
 # imports
 import os
+
+
+def _available_cpus():
+    # cores this process may run on; unlike os.cpu_count() this honours the
+    # CPU affinity set by containers and taskset
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count()
+
+# pin BLAS/OpenMP thread pools before numpy, torch or chemprop load them so
+# intra-op work does not oversubscribe the available cores
+os.environ.setdefault("OMP_NUM_THREADS", str(_available_cpus()))
+os.environ.setdefault("MKL_NUM_THREADS", os.environ["OMP_NUM_THREADS"])
+
+import torch
+torch.set_num_threads(int(os.environ["OMP_NUM_THREADS"]))
+torch.set_num_interop_threads(1)
+
 import pandas as pd
 import numpy as np
-import csv
 import sys
+import json
+import tempfile
+import traceback
+from contextlib import redirect_stdout
 from rdkit import Chem
 
+# number of input rows read and predicted at a time
+CHUNK_SIZE = 100_000
+
 root = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.join(root, ".."))
 
-from predictors.pampa50.pampa_predictor import PAMPA50Predictor 
-
-# pass the input file
-input_file = sys.argv[1]
-# pass the output file
-output_file = sys.argv[2]
-
-def my_model(smiles_list):
-    mols = [Chem.MolFromSmiles(smi) for smi in smiles_list]
-    kek_mols = []
-    for mol in mols:
-        if mol is not None:
-            Chem.Kekulize(mol)
-        kek_mols += [mol]
-    kek_smiles = [Chem.MolToSmiles(mol,kekuleSmiles=True) for mol in kek_mols]
-    predictor = PAMPA50Predictor(kekule_smiles = np.asarray(kek_smiles), smiles = np.asarray(smiles_list))
+# PAMPA50Predictor class, imported on first use; the import loads the GCNN
+# checkpoint, which then stays warm for the life of the process
+_predictor_cls = None
+
+
+def _get_predictor_cls():
+    global _predictor_cls
+    if _predictor_cls is None:
+        from predictors.pampa50.pampa_predictor import PAMPA50Predictor
+        _predictor_cls = PAMPA50Predictor
+    return _predictor_cls
+
+def _parse_smiles(smiles_list):
+    # parse SMILES in RDKit's C++ writer threads, returning mols in input
+    # order with None for blank entries and entries that fail to parse
+    if not hasattr(Chem, "MultithreadedSmilesMolSupplier"):
+        return [Chem.MolFromSmiles(smi) if smi.strip() else None for smi in smiles_list]
+
+    # the supplier reads one record per line, so blank entries are left out
+    mols = [None] * len(smiles_list)
+    rows = [row for row, smi in enumerate(smiles_list) if smi.strip()]
+    # the supplier rejects an empty file
+    if not rows:
+        return mols
+    with tempfile.NamedTemporaryFile("w", suffix=".smi", delete=False) as f:
+        f.writelines(smiles_list[row] + "\n" for row in rows)
+    try:
+        supplier = Chem.MultithreadedSmilesMolSupplier(
+            f.name, delimiter="\t", smilesColumn=0, nameColumn=-1, titleLine=False,
+            numWriterThreads=_available_cpus()
+            )
+        for mol in supplier:
+            # records arrive out of order; GetLastRecordId is 1-based. The
+            # supplier can yield a trailing None whose id is past the end or
+            # repeats a valid record's, so None never overwrites a slot
+            record = supplier.GetLastRecordId() - 1
+            if mol is None or not 0 <= record < len(rows):
+                continue
+            mols[rows[record]] = mol
+    finally:
+        os.remove(f.name)
+    return mols
+
+def main_once(smiles_list, cache_graphs=False):
+    mols = _parse_smiles(smiles_list)
+
+    # predict each distinct SMILES once; failed parses are masked out and
+    # inverse maps every valid input row to its position in the unique set.
+    # Duplicates are keyed on the input string rather than a canonical SMILES:
+    # canonicalizing costs one MolToSmiles per row, which is the round trip
+    # passing parsed mols to chemprop avoids, so differently written copies
+    # of one molecule are predicted separately (with the same result)
+    uniq_index = {}
+    uniq_mols, uniq_smiles, sizes = [], [], []
+    valid_rows, inverse = [], []
+    for row, (smi, mol) in enumerate(zip(smiles_list, mols)):
+        if mol is None:
+            continue
+        if smi not in uniq_index:
+            uniq_index[smi] = len(uniq_mols)
+            uniq_mols.append(mol)
+            uniq_smiles.append(smi)
+            sizes.append(mol.GetNumAtoms())
+        valid_rows.append(row)
+        inverse.append(uniq_index[smi])
+    if not uniq_mols:
+        return pd.DataFrame({"pampa5_proba1": np.full(len(smiles_list), np.nan)})
+
+    # predict largest molecules first so each batch holds similarly sized
+    # graphs and the per-batch neighbour padding stays small; the parsed
+    # mols go straight to chemprop instead of a kekule SMILES round trip
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i])
+    predictor = _get_predictor_cls()(
+        mols = [uniq_mols[i] for i in order],
+        smiles = [uniq_smiles[i] for i in order],
+        cache_graphs = cache_graphs
+        )
     pred_df = predictor.get_predictions()
-    
+
+    # restore the input order, broadcast duplicates and reinsert NaN rows
+    # for SMILES that could not be parsed
+    pred_df.index = order
+    pred_df = pred_df.loc[inverse]
+    pred_df.index = valid_rows
+    pred_df = pred_df.reindex(range(len(smiles_list))).reset_index(drop=True)
+
     return pred_df
 
-      
-# read SMILES from .csv file, assuming one column with header
-with open(input_file, "r") as f:
-    reader = csv.reader(f)
-    next(reader)  # skip header
-    smiles_list = [r[0] for r in reader]
 
-# run model
-output_df = my_model(smiles_list)
-output_df.to_csv(output_file, index=False)
\ No newline at end of file
+def run_csv(input_file, output_file):
+    # stream SMILES from .csv file in chunks, assuming one column with header,
+    # and append each chunk's predictions to the output file; blank rows are
+    # kept so they come back as NaN and the output stays aligned with the input
+    reader = pd.read_csv(
+        input_file, usecols=[0], dtype=str, keep_default_na=False,
+        skip_blank_lines=False, chunksize=CHUNK_SIZE
+        )
+    first = True
+    for chunk in reader:
+        output_df = main_once(chunk.iloc[:, 0].fillna("").tolist())
+        output_df.to_csv(output_file, mode="w" if first else "a", header=first, index=False)
+        first = False
+
+    # input without any rows still gets an output file with a header
+    if first:
+        pd.DataFrame(columns=["pampa5_proba1"]).to_csv(output_file, index=False)
+
+
+def serve():
+    # read one JSON array of SMILES per stdin line and answer with one JSON
+    # array of probabilities per stdout line (null for unparsable SMILES);
+    # an empty array gets an empty array back; a malformed or failing
+    # request is answered with {"error": message}, its traceback goes to
+    # stderr and the server keeps running; everything else printed while
+    # predicting is sent to stderr so stdout only carries responses; graph
+    # featurizations are cached across requests
+    out = sys.stdout
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            smiles_list = json.loads(line)
+            if not isinstance(smiles_list, list) or not all(isinstance(smi, str) for smi in smiles_list):
+                raise ValueError("request must be a JSON array of SMILES strings")
+            with redirect_stdout(sys.stderr):
+                output_df = main_once(smiles_list, cache_graphs=True)
+            probas = [None if np.isnan(p) else p for p in output_df["pampa5_proba1"].tolist()]
+            response = json.dumps(probas)
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            response = json.dumps({"error": str(e)})
+        out.write(response + "\n")
+        out.flush()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["--serve"]:
+        # long-running mode: python main.py --serve
+        serve()
+    else:
+        # single run: python main.py <input_file> <output_file>
+        run_csv(sys.argv[1], sys.argv[2])
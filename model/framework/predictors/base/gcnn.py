@@ -2,32 +2,46 @@ import numpy as np
 import pandas as pd
 import datetime
 
-from typing import Tuple
+from typing import List, Tuple
+from itertools import islice
 from datetime import timezone
 from numpy import array
+from rdkit.Chem.rdchem import Mol
 
-from chemprop.chemprop.data.utils import get_data_from_smiles, get_data_from_smiles_with_additional_features
+from chemprop.chemprop.data.utils import get_data_from_mols, get_data_from_smiles, get_data_from_smiles_with_additional_features
 from chemprop.chemprop.data import MoleculeDataLoader, MoleculeDataset
+from chemprop.chemprop.data.data import SMILES_TO_GRAPH
 from chemprop.chemprop.train import predict
 from .base import PredictorBase
 
+# maximum number of molecule graphs kept in chemprop's featurization cache;
+# each graph holds per-atom and per-bond feature lists (~100 KB for a
+# drug-sized molecule), so this keeps the cache to a few hundred MB
+GRAPH_CACHE_SIZE = 5_000
+
 class GcnnBase(PredictorBase):
 
     def __init__(
         self, 
-        kekule_smiles: array = None, 
+        kekule_smiles: List[str] = None, 
         additional_features: array = None, 
         column_dict_key = 'GCNN', 
         columns_dict_order: int = 1, 
-        smiles: array = None
+        smiles: List[str] = None,
+        batch_size: int = 50,
+        mols: List[Mol] = None,
+        cache_graphs: bool = False
         ):
         
         PredictorBase.__init__(self)
 
-        if kekule_smiles is None or len(kekule_smiles) == 0:
-            raise ValueError('Please provide a list of kekule smiles')
+        if (kekule_smiles is None or len(kekule_smiles) == 0) and (mols is None or len(mols) == 0):
+            raise ValueError('Please provide a list of kekule smiles or molecules')
+        if mols is not None and smiles is None:
+            raise ValueError('Please provide the smiles of the molecules')
 
         self.kekule_smiles = kekule_smiles
+        self.mols = mols
         self.additional_features = additional_features
         self.column_dict_key = column_dict_key
         self._columns_dict[column_dict_key] = {
@@ -37,6 +51,8 @@ class GcnnBase(PredictorBase):
         }
 
         self.smiles = smiles
+        self.batch_size = batch_size
+        self.cache_graphs = cache_graphs
         self.model_name = None
         self.model_version = None
 
@@ -57,10 +73,17 @@ class GcnnBase(PredictorBase):
             predictions, prediction_labels (Tuple[array, array]): predictions and labels
         """
 
-        smiles = self.kekule_smiles.tolist()
+        # parsed molecules are identified by their original smiles
+        smiles = list(self.kekule_smiles) if self.mols is None else list(self.smiles)
         feat = self.additional_features
 
-        if feat is not None:
+        if self.mols is not None:
+            full_data = get_data_from_mols(
+                smiles = smiles, 
+                mols = list(self.mols), 
+                features = feat
+                )
+        elif feat is not None:
             full_data = get_data_from_smiles_with_additional_features(
                 smiles = smiles, 
                 features = feat
@@ -74,17 +97,23 @@ class GcnnBase(PredictorBase):
         full_to_valid_indices = {}
         valid_index = 0
         for full_index in range(len(full_data)):
-            if full_data[full_index].mol is not None:
+            # molecules with a cached graph are known to be valid and need no parsing
+            if full_data[full_index].smiles in SMILES_TO_GRAPH or full_data[full_index].mol is not None:
                 full_to_valid_indices[full_index] = valid_index
                 valid_index += 1
 
         data = MoleculeDataset([full_data[i] for i in sorted(full_to_valid_indices.keys())])
 
+        # only cache graphs when asked to, and only for calls small enough
+        # that the cache cannot grow far past its bound before eviction
+        cache = self.cache_graphs and len(data) <= GRAPH_CACHE_SIZE
+
         # create data loader
         data_loader = MoleculeDataLoader(
             dataset=data,
-            batch_size=1,
-            num_workers=0
+            batch_size=self.batch_size,
+            num_workers=0,
+            cache=cache
         )
 
         model_preds = predict(
@@ -93,6 +122,12 @@ class GcnnBase(PredictorBase):
             scaler=scaler
         )
 
+        # evict the oldest graphs once the featurization cache is full
+        overflow = len(SMILES_TO_GRAPH) - GRAPH_CACHE_SIZE
+        if overflow > 0:
+            for cached_smiles in list(islice(SMILES_TO_GRAPH, overflow)):
+                del SMILES_TO_GRAPH[cached_smiles]
+
         predictions = np.ma.empty(len(full_data))
         predictions.mask = True
 
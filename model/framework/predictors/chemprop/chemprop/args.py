@@ -4,13 +4,45 @@ import torch
 import pickle
 
 from tempfile import TemporaryDirectory
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 from typing_extensions import Literal
 from tap import Tap  # pip install typed-argument-parser (https://github.com/swansonk14/typed-argument-parser)
 
 from . features import get_available_features_generators
 
 
+# Cache of checkpoint paths found per (checkpoint_dir, ext)
+CHECKPOINT_PATHS_CACHE: Dict[Tuple[str, str], Tuple[str, ...]] = {}
+
+
+def _find_checkpoints(checkpoint_dir: str, ext: str) -> Tuple[str, ...]:
+    """
+    Walks checkpoint_dir and collects the files ending in ext.
+
+    Non-empty results are cached per (checkpoint_dir, ext) so repeated calls do not walk the directory again.
+    Empty results are not cached so that checkpoints added later are still found.
+
+    :param checkpoint_dir: Path to a directory containing checkpoints.
+    :param ext: The extension which defines a checkpoint file.
+    :return: A tuple of paths to checkpoints.
+    """
+    key = (checkpoint_dir, ext)
+    if key in CHECKPOINT_PATHS_CACHE:
+        return CHECKPOINT_PATHS_CACHE[key]
+
+    checkpoint_paths = tuple(
+        os.path.join(root, fname)
+        for root, _, files in os.walk(checkpoint_dir)
+        for fname in files
+        if fname.endswith(ext)
+    )
+
+    if len(checkpoint_paths) > 0:
+        CHECKPOINT_PATHS_CACHE[key] = checkpoint_paths
+
+    return checkpoint_paths
+
+
 def get_checkpoint_paths(checkpoint_path: Optional[str] = None,
                          checkpoint_paths: Optional[List[str]] = None,
                          checkpoint_dir: Optional[str] = None,
@@ -39,12 +71,7 @@ def get_checkpoint_paths(checkpoint_path: Optional[str] = None,
         return checkpoint_paths
 
     if checkpoint_dir is not None:
-        checkpoint_paths = []
-
-        for root, _, files in os.walk(checkpoint_dir):
-            for fname in files:
-                if fname.endswith(ext):
-                    checkpoint_paths.append(os.path.join(root, fname))
+        checkpoint_paths = list(_find_checkpoints(checkpoint_dir, ext))
 
         if len(checkpoint_paths) == 0:
             raise ValueError(f'Failed to find any checkpoints with extension "{ext}" in directory "{checkpoint_dir}"')
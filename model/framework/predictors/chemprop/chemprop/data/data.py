@@ -20,7 +20,8 @@ class MoleculeDatapoint:
                  targets: List[float] = None,
                  row: OrderedDict = None,
                  features: np.ndarray = None,
-                 features_generator: List[str] = None):
+                 features_generator: List[str] = None,
+                 mol: Chem.Mol = None):
         """
         Initializes a MoleculeDatapoint, which contains a single molecule.
 
@@ -29,6 +30,7 @@ class MoleculeDatapoint:
         :param row: The raw CSV row containing the information for this molecule.
         :param args: Arguments.
         :param features: A numpy array containing additional features (ex. Morgan fingerprint).
+        :param mol: An already parsed RDKit molecule for the SMILES string, which skips parsing it again.
         """
         if features is not None and features_generator is not None:
             raise ValueError('Cannot provide both loaded features and a features generator.')
@@ -38,7 +40,7 @@ class MoleculeDatapoint:
         self.row = row or OrderedDict()
         self.features = features
         self.features_generator = features_generator
-        self._mol = 'None'  # Initialize with 'None' to distinguish between None returned by invalid molecule
+        self._mol = mol if mol is not None else 'None'  # Initialize with 'None' to distinguish between None returned by invalid molecule
 
         # Generate additional features if given a generator
         if self.features_generator is not None:
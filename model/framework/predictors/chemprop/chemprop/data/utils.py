@@ -231,6 +231,31 @@ def get_data_from_smiles(smiles: List[str],
 
     return data
 
+def get_data_from_mols(smiles: List[str],
+                       mols: List[Chem.Mol],
+                       features: List = None) -> MoleculeDataset:
+    """
+    Converts already parsed RDKit molecules to a MoleculeDataset without parsing their SMILES again.
+
+    :param smiles: A list of SMILES strings identifying the molecules.
+    :param mols: A list of RDKit molecules corresponding to the SMILES.
+    :param features: List of additional features.
+    :return: A MoleculeDataset with all of the provided molecules.
+    """
+    if features is None:
+        features = [None] * len(mols)
+
+    data = MoleculeDataset([
+        MoleculeDatapoint(
+            smiles=smile,
+            mol=mol,
+            features=feature,
+            row=OrderedDict({'smiles': smile})
+        ) for smile, mol, feature in zip(smiles, mols, features)
+    ])
+
+    return data
+
 def get_data_from_smiles_with_additional_features(smiles: List[str],
                          skip_invalid_smiles: bool = True,
                          logger: Logger = None,
@@ -1,6 +1,8 @@
 import csv
 import numpy as np
+import torch
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional, Union
 from tqdm import tqdm
 
@@ -70,23 +72,39 @@ def make_predictions(args: PredictArgs, smiles: List[str] = None) -> List[Option
     else:
         sum_preds = np.zeros((len(test_data), num_tasks))
 
-    # Create data loader
-    test_data_loader = MoleculeDataLoader(
-        dataset=test_data,
-        batch_size=args.batch_size,
-        num_workers=args.num_workers
-    )
-
-    print(f'Predicting with an ensemble of {len(args.checkpoint_paths)} models')
-    for checkpoint_path in tqdm(args.checkpoint_paths, total=len(args.checkpoint_paths)):
+    def predict_checkpoint(checkpoint_path: str) -> np.ndarray:
         # Load model
         model = load_checkpoint(checkpoint_path, device=args.device)
-        model_preds = predict(
-            model=model,
-            data_loader=test_data_loader,
-            scaler=scaler
+
+        # Create a data loader per thread without worker processes, since forking
+        # while other threads run torch ops can deadlock
+        test_data_loader = MoleculeDataLoader(
+            dataset=test_data,
+            batch_size=args.batch_size,
+            num_workers=0
         )
-        sum_preds += np.array(model_preds)
+
+        # Give each ensemble member its own CUDA stream so their kernels can overlap,
+        # after the weight copies queued on the current stream have finished
+        stream = None
+        if args.cuda:
+            stream = torch.cuda.Stream(device=args.device)
+            stream.wait_stream(torch.cuda.current_stream(args.device))
+        with torch.cuda.stream(stream):
+            model_preds = predict(
+                model=model,
+                data_loader=test_data_loader,
+                disable_progress_bar=True,
+                scaler=scaler
+            )
+
+        return np.array(model_preds)
+
+    # Ensemble members are independent, so run them concurrently
+    print(f'Predicting with an ensemble of {len(args.checkpoint_paths)} models')
+    with ThreadPoolExecutor(max_workers=len(args.checkpoint_paths)) as executor:
+        for model_preds in tqdm(executor.map(predict_checkpoint, args.checkpoint_paths), total=len(args.checkpoint_paths)):
+            sum_preds += model_preds
 
     # Ensemble predictions
     avg_preds = sum_preds / len(args.checkpoint_paths)
@@ -33,7 +33,7 @@ def predict(model: nn.Module,
         with torch.no_grad():
             batch_preds = model(mol_batch, features_batch)
 
-        batch_preds = batch_preds.data.cpu().numpy()
+        batch_preds = batch_preds.data.float().cpu().numpy()
 
         # Inverse scale if regression
         if scaler is not None:
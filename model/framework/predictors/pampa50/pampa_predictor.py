@@ -1,15 +1,37 @@
+import os
+import logging
 import numpy as np
 import pandas as pd
 import time
+import torch
 import warnings
 warnings.filterwarnings('ignore')
 
-from pandas import DataFrame
-from numpy import array
+from contextlib import nullcontext
+from typing import List
+from rdkit.Chem.rdchem import Mol
 
 from pampa50 import pampa_gcnn_scaler, pampa_gcnn_model
 from base.gcnn import GcnnBase
 
+logger = logging.getLogger(__name__)
+
+
+def _bf16_autocast():
+    """
+    Returns a bfloat16 autocast context if PAMPA_BF16 is set to 1 and the
+    inference device supports it, otherwise a no-op context. Off by default
+    since bfloat16 changes the published 3-decimal probabilities.
+    """
+    if os.environ.get('PAMPA_BF16') != '1':
+        return nullcontext()
+    if torch.cuda.is_available():
+        return torch.autocast('cuda', dtype=torch.bfloat16) if torch.cuda.is_bf16_supported() else nullcontext()
+    is_bf16_supported = getattr(getattr(torch, 'cpu', None), '_is_avx512_bf16_supported', None)
+    if is_bf16_supported is not None and is_bf16_supported():
+        return torch.autocast('cpu', dtype=torch.bfloat16)
+    return nullcontext()
+
 
 class PAMPA50Predictor(GcnnBase):
     """
@@ -23,22 +45,38 @@ class PAMPA50Predictor(GcnnBase):
 
     def __init__(
         self, 
-        kekule_smiles: array = None, 
-        smiles: array = None
+        kekule_smiles: List[str] = None, 
+        smiles: List[str] = None,
+        batch_size: int = None,
+        mols: List[Mol] = None,
+        cache_graphs: bool = False
         ):
         """
         Constructor for PAMPA50Predictor class
 
         Parameters:
-            kekule_smiles (Array): numpy array of RDkit molecules
+            kekule_smiles (List[str]): kekule SMILES of the molecules
+            smiles (List[str]): original SMILES of the molecules
+            batch_size (int): number of molecules per GCNN inference batch,
+                defaults to the PAMPA_BATCH environment variable or 256
+            mols (List[Mol]): already parsed RDKit molecules, used instead of
+                kekule_smiles so they are not parsed again
+            cache_graphs (bool): whether to keep molecule graph featurizations
+                for later calls, which only pays off in a long-running process
         """
 
+        if batch_size is None:
+            batch_size = int(os.environ.get('PAMPA_BATCH', 256))
+
         GcnnBase.__init__(
             self, 
             kekule_smiles, 
             column_dict_key='Predicted Class (Probability)', 
             columns_dict_order=1, 
-            smiles=smiles
+            smiles=smiles,
+            batch_size=batch_size,
+            mols=mols,
+            cache_graphs=cache_graphs
             )
 
         self._columns_dict['Prediction'] = {
@@ -49,7 +87,7 @@ class PAMPA50Predictor(GcnnBase):
 
         self.model_name = 'pampa50'
 
-    def get_predictions(self) -> DataFrame:
+    def get_predictions(self) -> pd.DataFrame:
         """
         Function that calculates consensus predictions
 
@@ -57,23 +95,31 @@ class PAMPA50Predictor(GcnnBase):
             Predictions (DataFrame): DataFrame with all predictions
         """
 
-        if len(self.kekule_smiles) > 0:
-
-            start = time.time()
-            gcnn_predictions, gcnn_labels = self.gcnn_predict(pampa_gcnn_model, pampa_gcnn_scaler)
-            end = time.time()
-            print(f'PAMPA 5.0: {end - start} seconds to predict {len(self.predictions_df.index)} molecules')
-
-            self.predictions_df['Prediction'] = pd.Series(
-                pd.Series(np.where(
-                    gcnn_predictions>=0.5, 
-                    'low permeability', 
-                    'moderate or high permeability'
+        molecules = self.mols if self.mols is not None else self.kekule_smiles
+        if len(molecules) > 0:
+
+            log_timing = logger.isEnabledFor(logging.INFO)
+            if log_timing:
+                start = time.perf_counter()
+            with torch.inference_mode(), _bf16_autocast():
+                gcnn_predictions, gcnn_labels = self.gcnn_predict(pampa_gcnn_model, pampa_gcnn_scaler)
+            if log_timing:
+                logger.info(
+                    'PAMPA 5.0: %s seconds to predict %d molecules', 
+                    time.perf_counter() - start, 
+                    len(self.predictions_df.index)
                     )
+
+            labels = np.where(
+                gcnn_predictions>=0.5, 
+                'low permeability', 
+                'moderate or high permeability'
+                )
+            self.predictions_df['Prediction'] = pd.Categorical(
+                labels, 
+                categories=['low permeability', 'moderate or high permeability']
                 )
-            )
 
-            proba1_df = pd.DataFrame()
-            proba1_df["pampa5_proba1"] = np.around(gcnn_predictions, 3)
+            proba1_df = pd.DataFrame({"pampa5_proba1": np.around(gcnn_predictions, 3)})
 
         return proba1_df
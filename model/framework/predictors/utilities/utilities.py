@@ -1,8 +1,11 @@
+import hashlib
 import requests
 import os
 import os.path as path
 import tempfile
 import time
+import torch
+import torch.nn as nn
 
 from numpy import array
 from pandas import DataFrame
@@ -12,9 +15,15 @@ from rdkit import Chem
 from rdkit.Chem.rdchem import Mol
 
 from chemprop.chemprop.utils import load_checkpoint, load_scalers
+from chemprop.chemprop.features import mol2graph
 from chemprop.chemprop.args import InterpretArgs
 from chemprop.chemprop.interpret import interpret
 
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
 
 def get_processed_smi(rdkit_mols: array) -> array:
     """
@@ -103,6 +112,149 @@ def load_gcnn_model_with_versioninfo(model_file_path, model_file_url):
     model_timestamp = datetime.fromtimestamp(os.path.getctime(model_file_path)).strftime('%Y-%m-%d')
     return gcnn_scaler, gcnn_model, model_timestamp
 
+class OnnxFfn(nn.Module):
+    """
+    Drop-in replacement for a chemprop feed-forward head that runs an
+    exported ONNX graph with ONNX Runtime
+
+    Attributes:
+        session (InferenceSession): ONNX Runtime session for the head
+    """
+
+    def __init__(self, onnx_file_path: str):
+        super(OnnxFfn, self).__init__()
+        self.session = ort.InferenceSession(onnx_file_path, providers=['CPUExecutionProvider'])
+
+    def forward(self, mol_vecs):
+        output = self.session.run(None, {'input': mol_vecs.detach().float().cpu().numpy()})[0]
+        return torch.from_numpy(output).to(mol_vecs.device)
+
+def get_file_digest(file_path):
+    """
+    Function returns the SHA-256 hex digest of a file
+
+    Parameters:
+        file_path (str): path of the file
+
+    Returns:
+        digest (str): hex digest of the file contents
+    """
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+def onnx_matches_checkpoint(onnx_file_path, model_file_path):
+    """
+    Function checks that an exported ONNX head was produced from the given
+    checkpoint, using the digest written next to it by export_gcnn_ffn_onnx
+
+    Parameters:
+        onnx_file_path (str): path of the ONNX graph
+        model_file_path (str): path of the chemprop checkpoint
+
+    Returns:
+        matches (bool): whether the recorded digest equals the checkpoint's
+    """
+    digest_file_path = onnx_file_path + '.sha256'
+    if not path.exists(digest_file_path):
+        return False
+    with open(digest_file_path) as f:
+        return f.read().strip() == get_file_digest(model_file_path)
+
+def export_gcnn_ffn_onnx(gcnn_model, onnx_file_path, model_file_path):
+    """
+    Function exports the feed-forward head of a chemprop model to ONNX and
+    records the checkpoint's digest in <onnx_file_path>.sha256
+
+    Parameters:
+        gcnn_model (MoleculeModel): model returned by load_gcnn_model
+        onnx_file_path (str): destination of the ONNX graph
+        model_file_path (str): checkpoint the model was loaded from
+    """
+    ffn = gcnn_model.ffn.eval()
+    in_features = next(m for m in ffn.modules() if isinstance(m, nn.Linear)).in_features
+    torch.onnx.export(
+        ffn,
+        torch.zeros(1, in_features),
+        onnx_file_path,
+        input_names=['input'],
+        output_names=['output'],
+        dynamic_axes={'input': {0: 'batch'}, 'output': {0: 'batch'}},
+        opset_version=17
+    )
+    with open(onnx_file_path + '.sha256', 'w') as f:
+        f.write(get_file_digest(model_file_path))
+
+def optimize_gcnn_model(gcnn_model, onnx_file_path=None, model_file_path=None):
+    """
+    Function prepares a loaded chemprop model for inference
+
+    The message passing encoder consumes BatchMolGraph objects and cannot be
+    exported or scripted, so only the feed-forward head is optimized. If the
+    model runs on CPU, onnxruntime is installed and an ONNX head exported
+    from this very checkpoint exists, it replaces the PyTorch head; otherwise
+    the head is compiled with TorchScript. The eager head is kept if both fail.
+
+    Setting the PAMPA_COMPILE environment variable to 1 additionally wraps
+    the whole model with torch.compile (PyTorch 2.x) in the default mode and
+    warms it up once; the head is then left in eager mode so Inductor can
+    fuse it, or scripted as usual if compilation fails. The encoder's readout
+    loops over the molecules of a batch, so each new batch length (typically
+    only the last, partial batch) and each autocast setting recompiles; once
+    torch._dynamo.config.cache_size_limit is reached dynamo falls back to
+    eager execution for that frame.
+
+    Parameters:
+        gcnn_model (MoleculeModel): model returned by load_gcnn_model
+        onnx_file_path (str): optional path to a head exported by export_gcnn_ffn_onnx
+        model_file_path (str): checkpoint the model was loaded from, checked
+            against the digest recorded with the ONNX head
+
+    Returns:
+        gcnn_model (MoleculeModel): the model in evaluation mode
+    """
+    compile_model = os.environ.get('PAMPA_COMPILE') == '1' and hasattr(torch, 'compile')
+
+    gcnn_model.eval()
+    on_cpu = next(gcnn_model.parameters()).device.type == 'cpu'
+    if on_cpu and onnx_file_path is not None and ort is not None and path.exists(onnx_file_path):
+        if model_file_path is not None and onnx_matches_checkpoint(onnx_file_path, model_file_path):
+            try:
+                gcnn_model.ffn = OnnxFfn(onnx_file_path)
+            except Exception as e:
+                print(f'Could not load ONNX GCNN feed-forward head, using PyTorch: {e}')
+        else:
+            print(f'Ignoring ONNX GCNN feed-forward head {onnx_file_path}: not exported from the current checkpoint')
+    if compile_model:
+        try:
+            # the default mode avoids recording a CUDA graph per batch shape
+            compiled_model = torch.compile(gcnn_model, dynamic=True)
+            # pay most of the compilation cost up front, under the same
+            # inference_mode used for predictions and with a multi-molecule
+            # batch of varying sizes so the graph is not specialised to one;
+            # the batch is featurized outside the compiled call, as the data
+            # loader does, since dynamo cannot trace into RDKit
+            warmup_batch = mol2graph([
+                'CC(=O)Oc1ccccc1C(=O)O',
+                'CN1C=NC2=C1C(=O)N(C(=O)N2C)C',
+                'CC(C)Cc1ccc(cc1)C(C)C(=O)O',
+                'OC[C@H]1OC(O)[C@H](O)[C@@H](O)[C@@H]1O'
+            ])
+            with torch.inference_mode():
+                compiled_model(warmup_batch)
+            return compiled_model
+        except Exception as e:
+            print(f'Could not compile GCNN model, using TorchScript: {e}')
+
+    if not isinstance(gcnn_model.ffn, OnnxFfn):
+        try:
+            gcnn_model.ffn = torch.jit.script(gcnn_model.ffn)
+        except Exception as e:
+            print(f'Could not script GCNN feed-forward head, using eager mode: {e}')
+    return gcnn_model
+
 def get_interpretation(kekule_smiles, model):
     start = time.time()
 